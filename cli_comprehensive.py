@@ -1,18 +1,8 @@
 """Comprehensive CLI example with custom help and all Click features"""
 
-from textwrap import dedent
 import click
 
-
-class CustomCliCommand(click.Command):
-    """Custom click.Command that overrides get_help() to show additional help info"""
-
-    def get_help(self, ctx):
-        help_text = super().get_help(ctx)
-        formatter = click.HelpFormatter()
-        formatter.write(
-            dedent(
-                f"""
+_COMMAND_HELP_TEMPLATE = """
 🚀 ADVANCED CLI TOOL
 
 This is a comprehensive example showcasing all Click features with custom help formatting.
@@ -26,20 +16,8 @@ This is a comprehensive example showcasing all Click features with custom help f
 
 For more help, visit: https://example.com/docs
 """
-            )
-        )
-        return formatter.getvalue()
-
 
-class CustomGroup(click.Group):
-    """Custom click.Group that overrides get_help() to show additional help info"""
-
-    def get_help(self, ctx):
-        help_text = super().get_help(ctx)
-        formatter = click.HelpFormatter()
-        formatter.write(
-            dedent(
-                f"""
+_GROUP_HELP_TEMPLATE = """
 🎯 COMMAND GROUP
 
 This group contains multiple related commands.
@@ -48,9 +26,20 @@ This group contains multiple related commands.
 
 💡 TIP: Use 'COMMAND --help' to get detailed help for each subcommand.
 """
-            )
-        )
-        return formatter.getvalue()
+
+
+class CustomCliCommand(click.Command):
+    """Custom click.Command that overrides get_help() to show additional help info"""
+
+    def get_help(self, ctx):
+        return _COMMAND_HELP_TEMPLATE.format(help_text=super().get_help(ctx))
+
+
+class CustomGroup(click.Group):
+    """Custom click.Group that overrides get_help() to show additional help info"""
+
+    def get_help(self, ctx):
+        return _GROUP_HELP_TEMPLATE.format(help_text=super().get_help(ctx))
 
 
 @click.group(cls=CustomGroup, name="myapp")
@@ -1,19 +1,8 @@
 """Sample CLI with custom click command"""
 
-from textwrap import dedent
-
 import click
 
-
-class CustomCliCommand(click.Command):
-    """Custom click.Command that overrides get_help() to show additional help info"""
-
-    def get_help(self, ctx):
-        help_text = super().get_help(ctx)
-        formatter = click.HelpFormatter()
-        formatter.write(
-            dedent(
-                f"""
+_HELP_TEMPLATE = """
 CLI Overview
 
 This is a sample CLI with custom help text.
@@ -22,9 +11,13 @@ This is a sample CLI with custom help text.
 
 This help text will appear after the command description.
 """
-            )
-        )
-        return formatter.getvalue()
+
+
+class CustomCliCommand(click.Command):
+    """Custom click.Command that overrides get_help() to show additional help info"""
+
+    def get_help(self, ctx):
+        return _HELP_TEMPLATE.format(help_text=super().get_help(ctx))
 
 
 @click.command(cls=CustomCliCommand, name="cli")
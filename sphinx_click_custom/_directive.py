@@ -0,0 +1,179 @@
+"""Sphinx directive for documenting Click commands with custom get_help() methods."""
+
+import typing as ty
+
+import click
+from docutils import nodes, statemachine
+from docutils.parsers.rst import directives
+from sphinx.util import logging
+from sphinx.util import nodes as sphinx_nodes
+from sphinx.util.docutils import SphinxDirective
+
+from ._core import (
+    NESTED_FULL,
+    NESTED_SHORT,
+    NestedT,
+    _cached_format_command_custom,
+    _get_click_context,
+    _get_click_object,
+    _has_process_lines_listeners,
+    nested,
+)
+
+LOG = logging.getLogger(__name__)
+
+
+class _JoinedLines:
+    """Log argument that joins the rendered lines only when it is formatted.
+
+    Sphinx's logger accepts every level and filters in its handlers, so
+    `LOG.isEnabledFor` is always true and cannot be used to skip the join.
+    """
+
+    __slots__ = ("lines",)
+
+    def __init__(self, lines: ty.List[str]) -> None:
+        self.lines = lines
+
+    def __str__(self) -> str:
+        return "\n".join(self.lines)
+
+
+class ClickCustomDirective(SphinxDirective):
+    """Sphinx directive for documenting Click commands with custom help methods."""
+
+    has_content = False
+    required_arguments = 1
+    option_spec = {
+        "prog": directives.unchanged_required,
+        "nested": nested,
+        "commands": directives.unchanged,
+        "show-nested": directives.flag,
+    }
+
+    def _generate_nodes(
+        self,
+        name: str,
+        command: click.Command,
+        parent: ty.Optional[click.Context],
+        nested: NestedT,
+        env,
+        commands: ty.Optional[ty.List[str]] = None,
+    ) -> ty.List[nodes.section]:
+        """Generate the relevant Sphinx nodes.
+
+        Format a `click.Group` or `click.Command`.
+
+        :param name: Name of command, as used on the command line
+        :param command: Instance of `click.Group` or `click.Command`
+        :param parent: Instance of `click.Context`, or None
+        :param nested: The granularity of subcommand details.
+        :param commands: Display only listed commands or skip the section if
+            empty
+        :returns: A list of nested docutil nodes
+        """
+        ctx = _get_click_context(command, name, parent)
+
+        if command.hidden:
+            return []
+
+        # Title
+        section = nodes.section(
+            "",
+            nodes.title(text=name),
+            ids=[nodes.make_id(ctx.command_path)],
+            names=[nodes.fully_normalize_name(ctx.command_path)],
+        )
+
+        # Summary
+        ctx.meta["sphinx-click-env"] = env
+        cache_size = env.config.click_custom_help_cache_size
+        if _has_process_lines_listeners(env.events):
+            # Event handlers must see (and may rewrite) every render
+            cache_size = 0
+        lines = _cached_format_command_custom(ctx, nested, commands, cache_size)
+        # Only spin up the nested RST parser when there is something to parse
+        if lines:
+            LOG.debug("%s", _JoinedLines(lines))
+
+            # Build the StringList in one go; each line gets its offset in the source
+            result = statemachine.StringList(lines, ctx.command_path)
+
+            # The default nested_parse used here takes its NestedStateMachine from
+            # the state's nested_sm_cache, so consecutive commands and directives
+            # already reuse one state machine rather than building a new one each
+            sphinx_nodes.nested_parse_with_titles(self.state, result, section)
+
+        # Handle nested commands for NESTED_FULL
+        if nested == NESTED_FULL and isinstance(command, click.Group):
+            subsections = self._generate_nested_nodes(ctx, nested, commands, env)
+            section.extend(subsections)
+
+        return [section]
+
+    def _generate_nested_nodes(
+        self,
+        ctx: click.Context,
+        nested: NestedT,
+        commands: ty.Optional[ty.List[str]],
+        env,
+    ) -> ty.List[nodes.section]:
+        """Generate nodes for nested subcommands."""
+        nodes_list: ty.List[nodes.section] = []
+        multicommand = ctx.command
+
+        if not isinstance(multicommand, click.Group):
+            return nodes_list
+
+        for name in multicommand.list_commands(ctx):
+            if commands is not None and name not in commands:
+                continue
+
+            command = multicommand.get_command(ctx, name)
+            if command is None or command.hidden:
+                continue
+
+            # Generate documentation for this subcommand
+            subsections = self._generate_nodes(name, command, ctx, nested, env)
+            nodes_list.extend(subsections)
+
+        return nodes_list
+
+    def run(self) -> ty.List[nodes.section]:
+        """Generate documentation nodes for the click command."""
+        env = self.state.document.settings.env
+
+        import_name = self.arguments[0]
+
+        try:
+            command = _get_click_object(import_name)
+        except Exception as e:
+            LOG.error(f"Failed to import click object '{import_name}': {e}")
+            return []
+
+        if not isinstance(command, click.Command):
+            LOG.error(f"Object '{import_name}' is not a Click command")
+            return []
+
+        if "prog" not in self.options:
+            raise self.error(":prog: must be specified")
+
+        prog_name = self.options["prog"]
+        show_nested = "show-nested" in self.options
+        nested = self.options.get("nested")
+
+        if show_nested:
+            if nested:
+                raise self.error(
+                    "':nested:' and ':show-nested:' are mutually exclusive"
+                )
+            else:
+                nested = NESTED_FULL if show_nested else NESTED_SHORT
+
+        commands = None
+        if self.options.get("commands"):
+            commands = [
+                command.strip() for command in self.options["commands"].split(",")
+            ]
+
+        return self._generate_nodes(prog_name, command, None, nested, env, commands)
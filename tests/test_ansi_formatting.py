@@ -2,7 +2,12 @@
 
 import pytest
 
-from sphinx_click_custom.ext import ANSI_ESC_SEQ_RE, _format_help, _looks_like_ascii_art
+from sphinx_click_custom.ext import (
+    ANSI_ESC_SEQ_RE,
+    _format_help,
+    _looks_like_ascii_art,
+    _strip_ansi,
+)
 
 
 def test_ansi_regex_24bit_colors():
@@ -21,6 +26,14 @@ def test_ansi_regex_24bit_colors():
     assert "\x1b[" not in cleaned
 
 
+def test_strip_ansi():
+    """Test that _strip_ansi removes escapes and passes plain text through."""
+    assert _strip_ansi("\x1b[1mBold\x1b[0m text") == "Bold text"
+
+    plain = "No escapes here"
+    assert _strip_ansi(plain) is plain
+
+
 def test_box_drawing_detection():
     """Test ASCII art detection for box drawing characters."""
     box_text = """┏━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━┓
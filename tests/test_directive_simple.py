@@ -1,10 +1,22 @@
 """Simplified directive tests focusing on testable functionality."""
 
+import click
 import pytest
 
-from sphinx_click_custom.ext import ClickCustomDirective, _get_click_object, nested
+from sphinx_click_custom.ext import (
+    _CONTEXT_CACHE,
+    ClickCustomDirective,
+    _get_click_context,
+    _get_click_object,
+    nested,
+)
 
-from .conftest import sample_custom_command, sample_custom_group, standard_command
+from .conftest import (
+    backup,
+    sample_custom_command,
+    sample_custom_group,
+    standard_command,
+)
 
 
 def test_directive_basic_properties():
@@ -42,6 +54,32 @@ def test_get_click_object_errors():
         _get_click_object("tests.conftest:nonexistent_command")
 
 
+def test_get_click_object_cached():
+    """Test _get_click_object caches results per import name."""
+    _get_click_object.cache_clear()
+    first = _get_click_object("tests.conftest:sample_custom_command")
+    second = _get_click_object("tests.conftest:sample_custom_command")
+    assert first is second
+    assert _get_click_object.cache_info().hits == 1
+
+    _get_click_object.cache_clear()
+    assert _get_click_object.cache_info().currsize == 0
+
+
+def test_get_click_context_cached():
+    """Test _get_click_context reuses contexts for the same command and name."""
+    _CONTEXT_CACHE.clear()
+    ctx = _get_click_context(sample_custom_group, "test-group", None)
+    assert ctx.command is sample_custom_group
+    assert ctx.info_name == "test-group"
+    assert _get_click_context(sample_custom_group, "test-group", None) is ctx
+    assert _get_click_context(sample_custom_group, "other", None) is not ctx
+
+    child = _get_click_context(backup, "backup", ctx)
+    assert child.parent is ctx
+    assert child.command_path == "test-group backup"
+
+
 def test_nested_validation():
     """Test nested argument validation."""
     # Valid values
@@ -77,6 +115,12 @@ def test_extension_setup_basic():
         def add_event(self, name):
             self.events.events[name] = True
 
+        def add_config_value(self, name, default, rebuild, types=()):
+            pass
+
+        def connect(self, event_name, callback):
+            pass
+
     app = MockApp()
     result = setup(app)
 
@@ -84,6 +128,11 @@ def test_extension_setup_basic():
     assert "click-custom" in app.directives
     assert app.directives["click-custom"] == ClickCustomDirective
 
+    # A second setup (e.g. another Sphinx app in the same process) reuses the class
+    other_app = MockApp()
+    setup(other_app)
+    assert other_app.directives["click-custom"] is app.directives["click-custom"]
+
     # Check return metadata
     assert isinstance(result, dict)
     assert "version" in result
@@ -102,3 +151,17 @@ def test_directive_class_instantiation():
     except Exception:
         # If instantiation fails, that's fine - we're just testing the class exists
         pass
+
+
+def test_get_click_context_unhashable_command():
+    """Test _get_click_context accepts commands that define __eq__ only."""
+
+    class EqCommand(click.Command):
+        def __eq__(self, other):
+            return isinstance(other, EqCommand) and self.name == other.name
+
+    first = EqCommand("same")
+    second = EqCommand("same")
+    ctx = _get_click_context(first, "same", None)
+    assert _get_click_context(first, "same", None) is ctx
+    assert _get_click_context(second, "same", None).command is second
@@ -280,6 +280,14 @@ def test_format_help_with_special_characters():
     assert "🚀🎯📝" in lines[0]
 
 
+def test_format_help_empty_or_blank():
+    """Test that empty or whitespace-only help produces just the trailing blank line."""
+    from sphinx_click_custom.ext import _format_help
+
+    assert _format_help("") == [""]
+    assert _format_help("  \n\t\n") == [""]
+
+
 def test_format_help_with_tabs_and_spaces():
     """Test help formatting with mixed tabs and spaces."""
     from sphinx_click_custom.ext import _format_help
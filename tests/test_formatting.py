@@ -5,7 +5,9 @@ from textwrap import dedent
 import click
 
 from sphinx_click_custom.ext import (
+    _HELP_CACHE,
     NESTED_FULL,
+    _cached_format_command_custom,
     _format_arguments,
     _format_command_custom,
     _format_custom_help_as_description,
@@ -34,6 +36,14 @@ def test_format_help_basic():
     assert lines[-1] == ""  # Ends with empty line
 
 
+def test_format_help_returns_list(click_context):
+    """Test that the top-level formatters return ready-made lists of lines."""
+    assert _format_help("Some help.") == ["Some help.", ""]
+
+    ctx = click_context(standard_command, "test-cmd")
+    assert isinstance(_format_command_custom(ctx, None), list)
+
+
 def test_format_help_multiline():
     """Test multiline help text formatting."""
     help_text = dedent(
@@ -52,6 +62,11 @@ def test_format_help_multiline():
     assert "Second paragraph here." in lines
 
 
+def test_format_help_form_feed():
+    """Test that \\f in a raw docstring still ends the line, as splitlines() does."""
+    assert _format_help("Summary.\f\nInternal.") == ["Summary.", "", "Internal.", ""]
+
+
 def test_format_help_with_ansi():
     """Test help text with ANSI escape sequences."""
     help_text = "This is \x1b[1mbold\x1b[0m text."
@@ -342,3 +357,52 @@ def test_format_command_custom_blank_line_after_program_directive(click_context)
                 f"Expected blank line after '.. program::' at index {i}, "
                 f"got: {lines[i + 1]!r}"
             )
+
+
+def test_cached_format_command_custom_reuses_lines(click_context):
+    """Test that repeated renders of the same command come from the cache."""
+    _HELP_CACHE.clear()
+    ctx = click_context(sample_custom_command, "test-custom")
+    first = _cached_format_command_custom(ctx, None)
+    second = _cached_format_command_custom(
+        click_context(sample_custom_command, "test-custom"), None
+    )
+
+    assert first is second
+    assert first == list(_format_command_custom(ctx, None))
+
+    # A different prog name is a different entry
+    other = _cached_format_command_custom(
+        click_context(sample_custom_command, "other"), None
+    )
+    assert other is not first
+    assert len(_HELP_CACHE) == 2
+
+
+def test_cached_format_command_custom_bounded(click_context):
+    """Test that the help cache evicts the oldest entries beyond max_size."""
+    _HELP_CACHE.clear()
+    _cached_format_command_custom(click_context(standard_command, "a"), None, None, 1)
+    _cached_format_command_custom(click_context(standard_command, "b"), None, None, 1)
+
+    assert len(_HELP_CACHE) == 1
+    assert list(_HELP_CACHE)[0][1] == "b"
+
+    _HELP_CACHE.clear()
+    _cached_format_command_custom(click_context(standard_command, "a"), None, None, 0)
+    assert len(_HELP_CACHE) == 0
+
+
+def test_format_command_custom_unhashable_command(click_context):
+    """Test formatting a custom command class that defines __eq__ only."""
+
+    class EqCommand(click.Command):
+        def __eq__(self, other):
+            return isinstance(other, EqCommand) and self.name == other.name
+
+        def get_help(self, ctx):
+            return "EQ HEADER\n\n" + super().get_help(ctx)
+
+    cmd = EqCommand("eq", help="An eq command.")
+    lines = _format_command_custom(click_context(cmd, "eq"), None)
+    assert "EQ HEADER" in "\n".join(lines)
@@ -1,5 +1,13 @@
 """Simplified integration tests."""
 
+import logging
+import subprocess
+import sys
+from textwrap import dedent
+
+from sphinx.application import Sphinx
+from sphinx.util.docutils import docutils_namespace
+
 from sphinx_click_custom.ext import setup
 
 
@@ -30,6 +38,12 @@ def test_extension_setup_function():
         def add_event(self, name):
             self.events.events[name] = True
 
+        def add_config_value(self, name, default, rebuild, types=()):
+            pass
+
+        def connect(self, event_name, callback):
+            pass
+
     app = MockApp()
     result = setup(app)
 
@@ -77,3 +91,70 @@ def test_module_imports():
     assert _format_usage is not None
     assert _format_options is not None
     assert setup is not None
+
+
+def test_module_import_does_not_load_sphinx():
+    """Test that importing the formatting helpers does not import Sphinx."""
+    code = (
+        "import sys\n"
+        "from sphinx_click_custom.ext import _format_help\n"
+        "assert not any(m == 'sphinx' or m.startswith('sphinx.') for m in sys.modules)\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True)
+    assert result.returncode == 0, result.stderr.decode()
+
+
+def test_process_lines_handler_runs_for_every_directive(tmp_path):
+    """Test that a connected sphinx-click-process-* handler sees every render."""
+    srcdir = tmp_path / "source"
+    srcdir.mkdir()
+    (srcdir / "conf.py").write_text(dedent("""
+            extensions = ["sphinx_click_custom.ext"]
+
+            def add_docname(app, ctx, lines):
+                lines.append("Documented in " + app.env.docname)
+
+            def setup(app):
+                app.connect("sphinx-click-process-options", add_docname)
+            """))
+    directive = dedent("""
+        .. click-custom:: tests.conftest:sample_custom_command
+           :prog: test-custom
+        """)
+    (srcdir / "index.rst").write_text(
+        "Index\n=====\n\n.. toctree::\n\n   other\n" + directive + directive
+    )
+    (srcdir / "other.rst").write_text("Other\n=====\n" + directive)
+
+    with docutils_namespace():
+        app = Sphinx(
+            srcdir=str(srcdir),
+            confdir=str(srcdir),
+            outdir=str(tmp_path / "build"),
+            doctreedir=str(tmp_path / "doctrees"),
+            buildername="text",
+            status=None,
+            warning=None,
+        )
+        app.build()
+
+    index = (tmp_path / "build" / "index.txt").read_text()
+    other = (tmp_path / "build" / "other.txt").read_text()
+    assert index.count("Documented in index") == 2
+    assert "Documented in other" in other
+    assert "Documented in index" not in other
+
+
+def test_debug_log_does_not_join_lines_by_default(sphinx_app, monkeypatch):
+    """Test that rendered lines are only joined when debug output is shown."""
+    from sphinx_click_custom import _directive
+
+    def fail(self):
+        raise AssertionError("lines joined for a suppressed debug message")
+
+    # Keep only Sphinx's own handlers; pytest's capture handlers accept DEBUG
+    logger = logging.getLogger("sphinx")
+    handlers = [h for h in logger.handlers if h.level > logging.DEBUG]
+    monkeypatch.setattr(logger, "handlers", handlers)
+    monkeypatch.setattr(_directive._JoinedLines, "__str__", fail)
+    sphinx_app.build()
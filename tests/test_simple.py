@@ -37,6 +37,12 @@ def test_extension_setup():
         def add_event(self, name):
             self.events.add_event(name)
 
+        def add_config_value(self, name, default, rebuild, types=()):
+            pass
+
+        def connect(self, event_name, callback):
+            pass
+
     class MockEvents:
         def __init__(self):
             self.events = {}